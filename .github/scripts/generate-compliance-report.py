@@ -6,18 +6,79 @@ This script generates compliance reports from SARIF files, mapping security
 findings to regulatory frameworks like RBI IT Framework, SEBI Guidelines, 
 and ISO 27001 standards.
 
+SARIF files are read through the shared sarif_io helpers, which stream them
+with ijson when it is installed, so memory use stays proportional to a single
+finding rather than the whole document, and serialize reports with orjson when
+available. Rule keywords are matched with a pyahocorasick automaton when
+available.
+
 Author: Security Architecture Team
 Version: 1.0.0
 """
 
-import json
 import argparse
+import functools
 import os
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Any, Optional
-import glob
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+
+from sarif_io import dump_json, iter_sarif_files, iter_sarif_results
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# SARIF levels that count as critical findings
+CRITICAL_LEVELS = frozenset(("error", "critical"))
+
+# Per-finding columns kept by the generator; see ComplianceReportGenerator._finding_columns
+FINDING_COLUMNS = ("rule_id", "severity", "message", "source_file", "controls", "remediation_priority")
+
+# Compliance controls as (framework, control, description). Findings and
+# statistics reference these shared tuples instead of building per-finding copies.
+ISO_A12_6_1 = ("ISO27001", "A.12.6.1", "Management of technical vulnerabilities")
+ISO_A10_1_1 = ("ISO27001", "A.10.1.1", "Policy on the use of cryptographic controls")
+ISO_A9_1_1 = ("ISO27001", "A.9.1.1", "Access control policy")
+RBI_IT_4_2_1 = ("RBI-IT-Framework", "RBI-IT-4.2.1", "Application Security - Secure coding practices")
+RBI_IT_4_1_3 = ("RBI-IT-Framework", "RBI-IT-4.1.3", "Access Control and Authentication")
+RBI_IT_4_3_3 = ("RBI-IT-Framework", "RBI-IT-4.3.3", "Customer Data Protection")
+SEBI_SG_2_1 = ("SEBI-Guidelines", "SEBI-SG-2.1", "System Governance and Risk Management")
+SEBI_DI_3_1 = ("SEBI-Guidelines", "SEBI-DI-3.1", "Data Integrity and Validation")
+
+# Controls with their rule keywords, listed in the order mappings appear in the report.
+COMPLIANCE_CONTROLS = (
+    (ISO_A12_6_1, frozenset({"sql-injection", "xss", "vulnerability"})),
+    (ISO_A10_1_1, frozenset({"crypto", "encryption", "cipher", "hash"})),
+    (ISO_A9_1_1, frozenset({"auth", "access", "authorization"})),
+    (RBI_IT_4_2_1, frozenset({"sql-injection", "xss", "injection"})),
+    (RBI_IT_4_1_3, frozenset({"auth", "session", "access"})),
+    (RBI_IT_4_3_3, frozenset({"pii", "personal", "data-protection"})),
+    (SEBI_SG_2_1, frozenset({"governance", "policy", "procedure"})),
+    (SEBI_DI_3_1, frozenset({"data-integrity", "validation", "consistency"})),
+)
+
+# Splits dash/underscore/slash separated rule ids into tokens
+RULE_TOKEN_SEPARATOR = re.compile(r"[^a-z0-9]+")
+
+
+def _build_keyword_automaton(control_indexes: Tuple[int, ...]):
+    """Build an Aho-Corasick automaton mapping each keyword to its control indexes."""
+    keyword_controls: Dict[str, List[int]] = {}
+    for index in control_indexes:
+        for keyword in COMPLIANCE_CONTROLS[index][1]:
+            keyword_controls.setdefault(keyword, []).append(index)
+            
+    automaton = ahocorasick.Automaton()
+    for keyword, indexes in keyword_controls.items():
+        automaton.add_word(keyword, tuple(indexes))
+    automaton.make_automaton()
+    return automaton
 
 
 class ComplianceReportGenerator:
@@ -25,9 +86,22 @@ class ComplianceReportGenerator:
     
     def __init__(self, standards: List[str]):
         self.standards = standards
+        # Only controls of enabled frameworks are ever matched, so no per-finding
+        # framework membership tests are needed
+        enabled = frozenset(standards)
+        self._active_controls = tuple(
+            index for index, ((framework, _, _), _) in enumerate(COMPLIANCE_CONTROLS)
+            if framework in enabled
+        )
+        if ahocorasick is not None and self._active_controls:
+            self._automaton = _build_keyword_automaton(self._active_controls)
+        else:
+            self._automaton = None
+        # SARIF logs repeat the same rule ids heavily, so keyword matching is memoized per rule
+        self._controls_for_rule = functools.lru_cache(maxsize=4096)(self._match_controls)
         self.report = {
             "metadata": {
-                "generated_at": datetime.now().isoformat(),
+                "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
                 "version": "1.0.0",
                 "standards": standards
             },
@@ -38,11 +112,16 @@ class ComplianceReportGenerator:
                 "risk_level": "LOW"
             },
             "compliance_mappings": {},
+            # Expanded from self._finding_columns when the report is written
             "detailed_findings": [],
             "remediation_summary": {},
             "audit_trail": []
         }
         
+        # Detailed findings are stored column-wise instead of as one dict per finding.
+        # "controls" holds the shared tuple cached by _controls_for_rule for the rule.
+        self._finding_columns: Dict[str, List[Any]] = {column: [] for column in FINDING_COLUMNS}
+        
         # Initialize compliance frameworks
         for standard in standards:
             self.report["compliance_mappings"][standard] = {
@@ -52,9 +131,14 @@ class ComplianceReportGenerator:
                 "findings_by_control": {}
             }
             
+        # Controls with any finding, and with any critical finding, per framework,
+        # maintained as findings arrive so finalizing does not rescan the controls
+        self._seen_controls: Dict[str, set] = {standard: set() for standard in standards}
+        self._failed_controls: Dict[str, set] = {standard: set() for standard in standards}
+            
     def generate_report(self, sarif_dir: str, output_dir: str) -> None:
         """Generate compliance report from SARIF files."""
-        sarif_files = glob.glob(os.path.join(sarif_dir, "**/*.sarif"), recursive=True)
+        sarif_files = sorted(iter_sarif_files(sarif_dir, skip_hidden=True))
         
         if not sarif_files:
             print(f"Warning: No SARIF files found in {sarif_dir}")
@@ -65,190 +149,178 @@ class ComplianceReportGenerator:
             
         print(f"Processing {len(sarif_files)} SARIF file(s) for compliance mapping")
         
-        for sarif_file in sarif_files:
-            try:
-                self._process_sarif_file(sarif_file)
-            except Exception as e:
-                print(f"Error processing {sarif_file}: {e}")
-                continue
+        if len(sarif_files) == 1:
+            partials = [self._process_file_safely(sarif_files[0])]
+        else:
+            partials = self._process_files_in_parallel(sarif_files)
+            
+        for partial in partials:
+            if partial is not None:
+                self._merge_partial_report(partial)
                 
         self._finalize_report()
         self._write_report(output_dir)
         
+    def _process_file_safely(self, sarif_file: str) -> Optional[Dict[str, Any]]:
+        """Process a SARIF file in-process, returning None on failure."""
+        try:
+            return _process_sarif_partial(self.standards, sarif_file)
+        except Exception as e:
+            print(f"Error processing {sarif_file}: {e}")
+            return None
+            
+    def _process_files_in_parallel(self, sarif_files: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Process SARIF files across worker processes, preserving file order."""
+        max_workers = min(len(sarif_files), os.cpu_count() or 1)
+        try:
+            executor = ProcessPoolExecutor(max_workers=max_workers)
+        except (OSError, NotImplementedError) as e:
+            print(f"Warning: Process pool unavailable ({e}), processing sequentially")
+            return [self._process_file_safely(sarif_file) for sarif_file in sarif_files]
+            
+        partials = []
+        with executor:
+            futures = [
+                executor.submit(_process_sarif_partial, self.standards, sarif_file)
+                for sarif_file in sarif_files
+            ]
+            for sarif_file, future in zip(sarif_files, futures):
+                try:
+                    partials.append(future.result())
+                except Exception as e:
+                    print(f"Error processing {sarif_file}: {e}")
+                    partials.append(None)
+        return partials
+        
+    def _merge_partial_report(self, partial: Dict[str, Any]) -> None:
+        """Fold the findings and control statistics of one SARIF file into the report."""
+        summary = self.report["executive_summary"]
+        summary["total_findings"] += partial["total_findings"]
+        summary["critical_findings"] += partial["critical_findings"]
+        for column, values in partial["finding_columns"].items():
+            self._finding_columns[column].extend(values)
+        
+        for framework, partial_controls in partial["findings_by_control"].items():
+            controls = self.report["compliance_mappings"][framework]["findings_by_control"]
+            for control, stats in partial_controls.items():
+                self._seen_controls[framework].add(control)
+                if stats["critical_findings"]:
+                    self._failed_controls[framework].add(control)
+                    
+                if control not in controls:
+                    controls[control] = dict(stats)
+                else:
+                    controls[control]["total_findings"] += stats["total_findings"]
+                    controls[control]["critical_findings"] += stats["critical_findings"]
+                    
     def _process_sarif_file(self, sarif_file: str) -> None:
         """Process a single SARIF file for compliance mapping."""
         print(f"Processing: {sarif_file}")
         
-        with open(sarif_file, 'r', encoding='utf-8') as f:
-            sarif_data = json.load(f)
-            
-        for run in sarif_data.get('runs', []):
-            self._process_run(run, sarif_file)
-            
-    def _process_run(self, run: Dict[str, Any], source_file: str) -> None:
-        """Process a single run from SARIF data."""
-        results = run.get('results', [])
-        self.report["executive_summary"]["total_findings"] += len(results)
-        
-        for result in results:
-            self._map_finding_to_compliance(result, source_file)
+        # A parse error propagates, and the caller drops everything mapped from this file
+        processed = 0
+        for result in iter_sarif_results(sarif_file):
+            self._map_finding_to_compliance(result, sarif_file)
+            processed += 1
+        self.report["executive_summary"]["total_findings"] += processed
             
     def _map_finding_to_compliance(self, result: Dict[str, Any], source_file: str) -> None:
         """Map a security finding to compliance frameworks."""
-        rule_id = result.get('ruleId', 'unknown')
-        level = result.get('level', 'note').lower()
+        # Rule ids and levels repeat across findings, so intern them to share one string each
+        rule_id = sys.intern(result.get('ruleId', 'unknown'))
+        level = sys.intern(result.get('level', 'note').lower())
         message = result.get('message', {}).get('text', '')
         
         # Track critical findings
-        if level in ['error', 'critical']:
+        if level in CRITICAL_LEVELS:
             self.report["executive_summary"]["critical_findings"] += 1
             
-        # Create detailed finding record
-        finding = {
-            "rule_id": rule_id,
-            "severity": level,
-            "message": message,
-            "source_file": source_file,
-            "compliance_mappings": [],
-            "remediation_priority": self._calculate_priority(level, rule_id)
-        }
-        
         # Map to specific compliance frameworks
-        if "ISO27001" in self.standards:
-            iso_mappings = self._map_to_iso27001(rule_id, level)
-            if iso_mappings:
-                finding["compliance_mappings"].extend(iso_mappings)
-                self._update_compliance_stats("ISO27001", iso_mappings, level)
-                
-        if "RBI-IT-Framework" in self.standards:
-            rbi_mappings = self._map_to_rbi_framework(rule_id, level)
-            if rbi_mappings:
-                finding["compliance_mappings"].extend(rbi_mappings)
-                self._update_compliance_stats("RBI-IT-Framework", rbi_mappings, level)
-                
-        if "SEBI-Guidelines" in self.standards:
-            sebi_mappings = self._map_to_sebi_guidelines(rule_id, level)
-            if sebi_mappings:
-                finding["compliance_mappings"].extend(sebi_mappings)
-                self._update_compliance_stats("SEBI-Guidelines", sebi_mappings, level)
-                
-        self.report["detailed_findings"].append(finding)
-        
-    def _map_to_iso27001(self, rule_id: str, level: str) -> List[Dict[str, str]]:
-        """Map finding to ISO 27001 controls."""
-        mappings = []
-        rule_lower = rule_id.lower()
-        
-        # A.12.6.1 - Management of technical vulnerabilities
-        if any(term in rule_lower for term in ['sql-injection', 'xss', 'vulnerability']):
-            mappings.append({
-                "framework": "ISO27001",
-                "control": "A.12.6.1",
-                "description": "Management of technical vulnerabilities",
-                "severity_impact": level
-            })
-            
-        # A.10.1.1 - Policy on the use of cryptographic controls
-        if any(term in rule_lower for term in ['crypto', 'encryption', 'cipher', 'hash']):
-            mappings.append({
-                "framework": "ISO27001",
-                "control": "A.10.1.1",
-                "description": "Policy on the use of cryptographic controls",
-                "severity_impact": level
-            })
-            
-        # A.9.1.1 - Access control policy
-        if any(term in rule_lower for term in ['auth', 'access', 'authorization']):
-            mappings.append({
-                "framework": "ISO27001",
-                "control": "A.9.1.1",
-                "description": "Access control policy",
-                "severity_impact": level
-            })
+        controls = self._controls_for_rule(rule_id)
+        if controls:
+            self._update_compliance_stats(controls, level)
             
-        return mappings
+        # Record detailed finding
+        columns = self._finding_columns
+        columns["rule_id"].append(rule_id)
+        columns["severity"].append(level)
+        columns["message"].append(message)
+        columns["source_file"].append(source_file)
+        columns["controls"].append(controls)
+        columns["remediation_priority"].append(self._calculate_priority(level, rule_id))
         
-    def _map_to_rbi_framework(self, rule_id: str, level: str) -> List[Dict[str, str]]:
-        """Map finding to RBI IT Framework controls."""
-        mappings = []
-        rule_lower = rule_id.lower()
-        
-        # RBI-IT-4.2.1 - Application Security
-        if any(term in rule_lower for term in ['sql-injection', 'xss', 'injection']):
-            mappings.append({
-                "framework": "RBI-IT-Framework",
-                "control": "RBI-IT-4.2.1",
-                "description": "Application Security - Secure coding practices",
-                "severity_impact": level
-            })
-            
-        # RBI-IT-4.1.3 - Access Control
-        if any(term in rule_lower for term in ['auth', 'session', 'access']):
-            mappings.append({
-                "framework": "RBI-IT-Framework",
-                "control": "RBI-IT-4.1.3",
-                "description": "Access Control and Authentication",
-                "severity_impact": level
-            })
+    def _iter_detailed_findings(self) -> Iterator[Dict[str, Any]]:
+        """Yield detailed finding records assembled from the finding columns."""
+        columns = self._finding_columns
+        for rule_id, level, message, source_file, controls, priority in zip(
+            *(columns[column] for column in FINDING_COLUMNS)
+        ):
+            yield {
+                "rule_id": rule_id,
+                "severity": level,
+                "message": message,
+                "source_file": source_file,
+                "compliance_mappings": self._map_all(controls, level),
+                "remediation_priority": priority
+            }
             
-        # RBI-IT-4.3.3 - Data Protection
-        if any(term in rule_lower for term in ['pii', 'personal', 'data-protection']):
-            mappings.append({
-                "framework": "RBI-IT-Framework",
-                "control": "RBI-IT-4.3.3",
-                "description": "Customer Data Protection",
+    def _map_all(self, controls: Tuple[Tuple[str, str, str], ...], level: str) -> List[Dict[str, str]]:
+        """Expand matched controls into compliance mapping records."""
+        return [
+            {
+                "framework": framework,
+                "control": control,
+                "description": description,
                 "severity_impact": level
-            })
-            
-        return mappings
+            }
+            for framework, control, description in controls
+        ]
         
-    def _map_to_sebi_guidelines(self, rule_id: str, level: str) -> List[Dict[str, str]]:
-        """Map finding to SEBI Guidelines."""
-        mappings = []
+    def _match_controls(self, rule_id: str) -> Tuple[Tuple[str, str, str], ...]:
+        """Return (framework, control, description) for each enabled control matching the rule."""
+        if not self._active_controls:
+            return ()
+            
         rule_lower = rule_id.lower()
         
-        # SEBI-SG-2.1 - System Governance
-        if any(term in rule_lower for term in ['governance', 'policy', 'procedure']):
-            mappings.append({
-                "framework": "SEBI-Guidelines",
-                "control": "SEBI-SG-2.1",
-                "description": "System Governance and Risk Management",
-                "severity_impact": level
-            })
-            
-        # SEBI-DI-3.1 - Data Integrity
-        if any(term in rule_lower for term in ['data-integrity', 'validation', 'consistency']):
-            mappings.append({
-                "framework": "SEBI-Guidelines",
-                "control": "SEBI-DI-3.1",
-                "description": "Data Integrity and Validation",
-                "severity_impact": level
-            })
+        if self._automaton is not None:
+            hits = set()
+            for _, control_indexes in self._automaton.iter(rule_lower):
+                hits.update(control_indexes)
+        else:
+            # A whole-token hit implies a substring hit, so the substring scan only
+            # runs for controls none of whose keywords appear as a token
+            tokens = frozenset(RULE_TOKEN_SEPARATOR.split(rule_lower))
+            hits = {
+                index for index in self._active_controls
+                if COMPLIANCE_CONTROLS[index][1] & tokens
+                or any(term in rule_lower for term in COMPLIANCE_CONTROLS[index][1])
+            }
             
-        return mappings
+        return tuple(COMPLIANCE_CONTROLS[index][0] for index in sorted(hits))
         
-    def _update_compliance_stats(self, framework: str, mappings: List[Dict], level: str) -> None:
+    def _update_compliance_stats(self, controls: Tuple[Tuple[str, str, str], ...], level: str) -> None:
         """Update compliance statistics."""
-        if framework not in self.report["compliance_mappings"]:
-            return
-            
-        for mapping in mappings:
-            control = mapping["control"]
-            if control not in self.report["compliance_mappings"][framework]["findings_by_control"]:
-                self.report["compliance_mappings"][framework]["findings_by_control"][control] = {
+        is_critical = level in CRITICAL_LEVELS
+        for framework, control, description in controls:
+            findings_by_control = self.report["compliance_mappings"][framework]["findings_by_control"]
+            if control not in findings_by_control:
+                self._seen_controls[framework].add(control)
+                findings_by_control[control] = {
                     "total_findings": 0,
                     "critical_findings": 0,
-                    "description": mapping["description"]
+                    "description": description
                 }
                 
-            self.report["compliance_mappings"][framework]["findings_by_control"][control]["total_findings"] += 1
+            findings_by_control[control]["total_findings"] += 1
             
-            if level in ['error', 'critical']:
-                self.report["compliance_mappings"][framework]["findings_by_control"][control]["critical_findings"] += 1
+            if is_critical:
+                findings_by_control[control]["critical_findings"] += 1
+                self._failed_controls[framework].add(control)
                 
     def _calculate_priority(self, level: str, rule_id: str) -> str:
         """Calculate remediation priority."""
-        if level in ['error', 'critical']:
+        if level in CRITICAL_LEVELS:
             return "HIGH"
         elif level == 'warning':
             return "MEDIUM"
@@ -259,11 +331,8 @@ class ComplianceReportGenerator:
         """Finalize the compliance report with summary calculations."""
         # Calculate compliance scores
         for framework, data in self.report["compliance_mappings"].items():
-            failed_controls = len([
-                control for control, details in data["findings_by_control"].items()
-                if details["critical_findings"] > 0
-            ])
-            total_controls = max(1, len(data["findings_by_control"]))
+            failed_controls = len(self._failed_controls[framework])
+            total_controls = max(1, len(self._seen_controls[framework]))
             
             data["failed_controls"] = failed_controls
             data["total_controls"] = total_controls
@@ -294,8 +363,7 @@ class ComplianceReportGenerator:
         
         # Write main report
         report_file = os.path.join(output_dir, "compliance-report.json")
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(self.report, f, indent=2)
+        self._write_report_json(report_file)
             
         # Write summary report
         summary_file = os.path.join(output_dir, "compliance-summary.json")
@@ -312,11 +380,50 @@ class ComplianceReportGenerator:
             }
         }
         
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
+        with open(summary_file, 'wb') as f:
+            f.write(dump_json(summary))
             
         print(f"Compliance report generated: {report_file}")
         print(f"Compliance summary generated: {summary_file}")
+        
+    def _write_report_json(self, report_file: str) -> None:
+        """Write the full report, streaming detailed findings one at a time."""
+        with open(report_file, 'wb') as f:
+            f.write(b"{")
+            for index, (key, value) in enumerate(self.report.items()):
+                f.write(b",\n  " if index else b"\n  ")
+                f.write(dump_json(key) + b": ")
+                
+                if key == "detailed_findings" and self._finding_columns["rule_id"]:
+                    # Serialize findings individually so the full list is never one buffer
+                    f.write(b"[")
+                    for finding_index, finding in enumerate(self._iter_detailed_findings()):
+                        f.write(b",\n    " if finding_index else b"\n    ")
+                        f.write(dump_json(finding, depth=2))
+                    f.write(b"\n  ]")
+                else:
+                    f.write(dump_json(value, depth=1))
+            f.write(b"\n}")
+
+
+def _process_sarif_partial(standards: List[str], sarif_file: str) -> Dict[str, Any]:
+    """Map one SARIF file on a fresh generator and return its partial results.
+    
+    Runs in worker processes, so it only returns the pieces of the report that
+    the parent needs to merge.
+    """
+    generator = ComplianceReportGenerator(standards)
+    generator._process_sarif_file(sarif_file)
+    report = generator.report
+    return {
+        "total_findings": report["executive_summary"]["total_findings"],
+        "critical_findings": report["executive_summary"]["critical_findings"],
+        "finding_columns": generator._finding_columns,
+        "findings_by_control": {
+            framework: data["findings_by_control"]
+            for framework, data in report["compliance_mappings"].items()
+        }
+    }
 
 
 def main():
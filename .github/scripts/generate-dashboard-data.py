@@ -5,15 +5,51 @@ Creates interactive dashboards from security scan results
 """
 
 import json
+import os
 import sys
 import argparse
 from datetime import datetime, timedelta
 from pathlib import Path
-import html
+from string import Template
+from html import escape as html_escape
+
+# Table row templates, filled with %-formatting once per row
+TOP_ISSUE_ROW = """
+            <tr>
+                <td>%s</td>
+                <td><span class="metric %s" style="padding: 3px 8px; font-size: 12px;">
+                    %s
+                </span></td>
+                <td>%s</td>
+                <td>%s</td>
+            </tr>
+            """
+
+DEPENDENCY_ROW = """
+                <tr>
+                    <td>%s</td>
+                    <td>%s</td>
+                    <td>%s</td>
+                    <td><span class="metric %s" style="padding: 2px 6px; font-size: 11px;">
+                        %s
+                    </span></td>
+                </tr>
+                """
+
+REMEDIATION_ROW = """
+            <tr>
+                <td>%s</td>
+                <td><span class="metric %s" style="padding: 2px 6px; font-size: 11px;">
+                    %s
+                </span></td>
+                <td>%s</td>
+                <td>%s</td>
+            </tr>
+            """
 
 class SecurityDashboardGenerator:
     def __init__(self):
-        self.dashboard_template = """
+        self.dashboard_template = Template("""
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -75,20 +111,20 @@ class SecurityDashboardGenerator:
     <div class="header">
         <h1>🏛️ BFSI Security Dashboard</h1>
         <p>Financial Services Security Monitoring and Compliance Reporting</p>
-        <p><strong>Generated:</strong> {timestamp}</p>
+        <p><strong>Generated:</strong> $timestamp</p>
     </div>
 
     <div class="dashboard-grid">
         <!-- Security Overview -->
         <div class="card">
             <h2>🔒 Security Overview</h2>
-            {security_overview}
+            $security_overview
         </div>
 
         <!-- Compliance Status -->
         <div class="card">
             <h2>📋 Compliance Status</h2>
-            {compliance_status}
+            $compliance_status
         </div>
 
         <!-- Vulnerability Trends -->
@@ -102,52 +138,55 @@ class SecurityDashboardGenerator:
         <!-- Top Security Issues -->
         <div class="card">
             <h2>⚠️ Top Security Issues</h2>
-            {top_issues}
+            $top_issues
         </div>
 
         <!-- Dependency Security -->
         <div class="card">
             <h2>📦 Dependency Security</h2>
-            {dependency_security}
+            $dependency_security
         </div>
 
         <!-- Remediation Timeline -->
         <div class="card">
             <h2>🔧 Remediation Timeline</h2>
-            {remediation_timeline}
+            $remediation_timeline
         </div>
     </div>
 
     <script>
         // Vulnerability trends chart
         const trendsCtx = document.getElementById('trendsChart').getContext('2d');
-        new Chart(trendsCtx, {{
+        new Chart(trendsCtx, {
             type: 'line',
-            data: {trends_data},
-            options: {{
+            data: $trends_data,
+            options: {
                 responsive: true,
                 maintainAspectRatio: false,
-                scales: {{
-                    y: {{
+                scales: {
+                    y: {
                         beginAtZero: true,
-                        title: {{
+                        title: {
                             display: true,
                             text: 'Number of Vulnerabilities'
-                        }}
-                    }},
-                    x: {{
-                        title: {{
+                        }
+                    },
+                    x: {
+                        title: {
                             display: true,
                             text: 'Date'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
     </script>
 </body>
 </html>
-        """
+        """)
+        
+        # Static text and placeholder names alternate so sections can be streamed in order
+        self.template_parts = split_template(self.dashboard_template)
 
     def generate_dashboard(self, metrics_file, output_file):
         """Generate HTML dashboard from security metrics"""
@@ -155,28 +194,29 @@ class SecurityDashboardGenerator:
             with open(metrics_file, 'r') as f:
                 metrics = json.load(f)
             
-            # Generate dashboard sections
-            security_overview = self.generate_security_overview(metrics)
-            compliance_status = self.generate_compliance_status(metrics)
-            top_issues = self.generate_top_issues(metrics)
-            dependency_security = self.generate_dependency_security(metrics)
-            remediation_timeline = self.generate_remediation_timeline(metrics)
-            trends_data = self.generate_trends_data(metrics)
-            
-            # Generate HTML
-            html_content = self.dashboard_template.format(
-                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                security_overview=security_overview,
-                compliance_status=compliance_status,
-                top_issues=top_issues,
-                dependency_security=dependency_security,
-                remediation_timeline=remediation_timeline,
-                trends_data=json.dumps(trends_data)
-            )
+            # Dashboard sections are generated only when their placeholder is reached
+            sections = {
+                'timestamp': lambda: datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'security_overview': lambda: self.generate_security_overview(metrics),
+                'compliance_status': lambda: self.generate_compliance_status(metrics),
+                'top_issues': lambda: self.generate_top_issues(metrics),
+                'dependency_security': lambda: self.generate_dependency_security(metrics),
+                'remediation_timeline': lambda: self.generate_remediation_timeline(metrics),
+                'trends_data': lambda: json.dumps(self.generate_trends_data(metrics))
+            }
             
-            # Write dashboard
-            with open(output_file, 'w') as f:
-                f.write(html_content)
+            # Write dashboard section by section; the temporary file keeps a
+            # failed run from leaving a truncated dashboard behind
+            temp_file = f"{output_file}.tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                    for index, part in enumerate(self.template_parts):
+                        f.write(sections[part]() if index % 2 else part)
+                os.replace(temp_file, output_file)
+            except BaseException:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+                raise
             
             print(f"Security dashboard generated: {output_file}")
             
@@ -188,7 +228,7 @@ class SecurityDashboardGenerator:
         """Generate security overview section"""
         overview = metrics.get('summary', {})
         
-        html = f"""
+        return f"""
         <div class="metric critical">
             <h3>Critical Issues</h3>
             <div style="font-size: 24px; font-weight: bold;">
@@ -218,8 +258,6 @@ class SecurityDashboardGenerator:
             <strong>Security Score:</strong> {self.calculate_security_score(overview)}/100
         </div>
         """
-        
-        return html
 
     def generate_compliance_status(self, metrics):
         """Generate compliance status section"""
@@ -232,7 +270,8 @@ class SecurityDashboardGenerator:
             ('IRDAI Guidelines', compliance.get('irdai', {}))
         ]
         
-        html = ""
+        parts = []
+        parts_append = parts.append
         for name, status_info in frameworks:
             status = status_info.get('status', 'unknown')
             score = status_info.get('score', 0)
@@ -241,15 +280,15 @@ class SecurityDashboardGenerator:
             css_class = 'compliant' if status == 'compliant' else \
                        'partial' if status == 'partial' else 'non-compliant'
             
-            html += f"""
+            parts_append(f"""
             <div class="compliance-status {css_class}">
                 <strong>{name}</strong><br>
                 Status: {status.upper()}<br>
                 Score: {score}% | Issues: {issues}
             </div>
-            """
+            """)
         
-        return html
+        return "".join(parts)
 
     def generate_top_issues(self, metrics):
         """Generate top security issues section"""
@@ -258,29 +297,27 @@ class SecurityDashboardGenerator:
         if not issues:
             return "<p>No critical security issues found.</p>"
         
-        html = "<table><tr><th>Issue</th><th>Severity</th><th>Component</th><th>Status</th></tr>"
+        parts = ["<table><tr><th>Issue</th><th>Severity</th><th>Component</th><th>Status</th></tr>"]
+        parts_append = parts.append
         
         for issue in issues[:10]:  # Top 10 issues
             severity_class = issue.get('severity', 'low').lower()
-            html += f"""
-            <tr>
-                <td>{html.escape(issue.get('title', 'Unknown'))}</td>
-                <td><span class="metric {severity_class}" style="padding: 3px 8px; font-size: 12px;">
-                    {issue.get('severity', 'Unknown').upper()}
-                </span></td>
-                <td>{html.escape(issue.get('component', 'Unknown'))}</td>
-                <td>{issue.get('status', 'Open')}</td>
-            </tr>
-            """
+            parts_append(TOP_ISSUE_ROW % (
+                html_escape(issue.get('title', 'Unknown')),
+                severity_class,
+                issue.get('severity', 'Unknown').upper(),
+                html_escape(issue.get('component', 'Unknown')),
+                issue.get('status', 'Open')
+            ))
         
-        html += "</table>"
-        return html
+        parts_append("</table>")
+        return "".join(parts)
 
     def generate_dependency_security(self, metrics):
         """Generate dependency security section"""
         deps = metrics.get('dependencies', {})
         
-        html = f"""
+        parts = [f"""
         <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 10px;">
             <div class="metric">
                 <strong>Total Dependencies</strong><br>
@@ -301,27 +338,25 @@ class SecurityDashboardGenerator:
         </div>
         
         <h4>High-Risk Dependencies</h4>
-        """
+        """]
+        parts_append = parts.append
         
         risky_deps = deps.get('high_risk', [])
         if risky_deps:
-            html += "<table><tr><th>Dependency</th><th>Current</th><th>Latest</th><th>Risk</th></tr>"
+            parts_append("<table><tr><th>Dependency</th><th>Current</th><th>Latest</th><th>Risk</th></tr>")
             for dep in risky_deps[:5]:
-                html += f"""
-                <tr>
-                    <td>{html.escape(dep.get('name', 'Unknown'))}</td>
-                    <td>{dep.get('current_version', 'Unknown')}</td>
-                    <td>{dep.get('latest_version', 'Unknown')}</td>
-                    <td><span class="metric {dep.get('risk_level', 'low').lower()}" style="padding: 2px 6px; font-size: 11px;">
-                        {dep.get('risk_level', 'Unknown').upper()}
-                    </span></td>
-                </tr>
-                """
-            html += "</table>"
+                parts_append(DEPENDENCY_ROW % (
+                    html_escape(dep.get('name', 'Unknown')),
+                    dep.get('current_version', 'Unknown'),
+                    dep.get('latest_version', 'Unknown'),
+                    dep.get('risk_level', 'low').lower(),
+                    dep.get('risk_level', 'Unknown').upper()
+                ))
+            parts_append("</table>")
         else:
-            html += "<p>No high-risk dependencies identified.</p>"
+            parts_append("<p>No high-risk dependencies identified.</p>")
         
-        return html
+        return "".join(parts)
 
     def generate_remediation_timeline(self, metrics):
         """Generate remediation timeline section"""
@@ -330,25 +365,23 @@ class SecurityDashboardGenerator:
         if not timeline:
             return "<p>No pending remediations.</p>"
         
-        html = "<table><tr><th>Issue</th><th>Priority</th><th>Due Date</th><th>Assignee</th></tr>"
+        parts = ["<table><tr><th>Issue</th><th>Priority</th><th>Due Date</th><th>Assignee</th></tr>"]
+        parts_append = parts.append
         
         for item in timeline:
             priority_class = item.get('priority', 'P3').lower()
             due_date = item.get('due_date', 'TBD')
             
-            html += f"""
-            <tr>
-                <td>{html.escape(item.get('issue', 'Unknown'))}</td>
-                <td><span class="metric {priority_class}" style="padding: 2px 6px; font-size: 11px;">
-                    {item.get('priority', 'P3')}
-                </span></td>
-                <td>{due_date}</td>
-                <td>{item.get('assignee', 'Unassigned')}</td>
-            </tr>
-            """
+            parts_append(REMEDIATION_ROW % (
+                html_escape(item.get('issue', 'Unknown')),
+                priority_class,
+                item.get('priority', 'P3'),
+                due_date,
+                item.get('assignee', 'Unassigned')
+            ))
         
-        html += "</table>"
-        return html
+        parts_append("</table>")
+        return "".join(parts)
 
     def generate_trends_data(self, metrics):
         """Generate chart data for trends"""
@@ -356,7 +389,8 @@ class SecurityDashboardGenerator:
         
         # Default trend data if not available
         if not trends:
-            dates = [(datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7, 0, -1)]
+            today = datetime.now()
+            dates = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7, 0, -1)]
             return {
                 'labels': dates,
                 'datasets': [
@@ -396,6 +430,27 @@ class SecurityDashboardGenerator:
         score = max(0, 100 - (weighted_score / max_possible * 100))
         return round(score, 1)
 
+def split_template(template):
+    """Split a string.Template into alternating static text and placeholder names"""
+    parts = []
+    literal = []
+    text = template.template
+    position = 0
+    for match in template.pattern.finditer(text):
+        literal.append(text[position:match.start()])
+        name = match.group('named') or match.group('braced')
+        if name is None:
+            # An escaped "$$" (or a stray "$") stays literal text
+            literal.append(template.delimiter if match.group('escaped') is not None else match.group(0))
+        else:
+            parts.append("".join(literal))
+            parts.append(name)
+            literal = []
+        position = match.end()
+    literal.append(text[position:])
+    parts.append("".join(literal))
+    return parts
+
 def main():
     parser = argparse.ArgumentParser(description='Generate BFSI security dashboard')
     parser.add_argument('--metrics', '-m', required=True, help='Security metrics JSON file')
@@ -4,12 +4,73 @@ SARIF Processing Script for BFSI Compliance
 Processes CodeQL SARIF results for financial services compliance reporting
 """
 
-import json
 import sys
 import argparse
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
+from sarif_io import EMPTY, LEVEL_MAP, dump_json, iter_sarif_results
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Shared read-only default for missing locations, so results without any don't allocate
+_NO_LOCATIONS = ()
+
+# Description prefix and category used for each framework's control mapping
+FRAMEWORK_LABELS = {
+    'rbi': ('RBI IT Framework control', 'Information Security'),
+    'iso27001': ('ISO 27001 control', 'Information Security Management'),
+    'sebi': ('SEBI IT Governance', 'System Governance')
+}
+
+@dataclass
+class Location:
+    """Physical location of a SARIF finding"""
+    __slots__ = ('file', 'start_line', 'start_column', 'end_line', 'end_column')
+    file: str
+    start_line: int
+    start_column: int
+    end_line: int
+    end_column: int
+
+    def to_dict(self):
+        return {
+            'file': self.file,
+            'start_line': self.start_line,
+            'start_column': self.start_column,
+            'end_line': self.end_line,
+            'end_column': self.end_column
+        }
+
+@dataclass
+class ProcessedResult:
+    """SARIF result with its compliance framework mappings"""
+    __slots__ = ('rule_id', 'message', 'level', 'compliance_mappings', 'locations',
+                 'fingerprint', 'timestamp')
+    rule_id: str
+    message: str
+    level: str
+    compliance_mappings: dict
+    locations: list
+    fingerprint: dict
+    timestamp: str
+
+    def to_dict(self):
+        return {
+            'rule_id': self.rule_id,
+            'message': self.message,
+            'level': self.level,
+            'compliance_mappings': self.compliance_mappings,
+            'locations': self.locations,
+            'fingerprint': self.fingerprint,
+            'timestamp': self.timestamp
+        }
+
 class SARIFProcessor:
     def __init__(self):
         self.rbi_mappings = {
@@ -34,19 +95,52 @@ class SARIFProcessor:
             "data-integrity": "SEBI-IT-3.1",
             "audit-trail": "SEBI-IT-4.1"
         }
+        
+        self._framework_mappings = (
+            ('rbi', self.rbi_mappings),
+            ('iso27001', self.iso27001_mappings),
+            ('sebi', self.sebi_mappings)
+        )
+        # One flat (pattern, framework, order, mapping) table over every framework,
+        # in declaration order, with each mapping record built once up front
+        self._all_mappings = tuple(
+            (pattern, framework, order, {
+                'control': control,
+                'description': f'{FRAMEWORK_LABELS[framework][0]} {control}',
+                'category': FRAMEWORK_LABELS[framework][1]
+            })
+            for framework, mappings in self._framework_mappings
+            for order, (pattern, control) in enumerate(mappings.items())
+        )
+        self._automaton = self._build_automaton() if ahocorasick is not None else None
+        
+        # Shared by every result of a processing run; set by process_sarif_file
+        self._run_timestamp = None
+        
+        # Compliance mappings per rule id; SARIF runs repeat the same rules many times
+        self._rule_cache = {}
+
+    def _build_automaton(self):
+        """Build one Aho-Corasick automaton over the patterns of every framework"""
+        pattern_hits = {}
+        for pattern, framework, order, mapping in self._all_mappings:
+            pattern_hits.setdefault(pattern, []).append((framework, order, mapping))
+        
+        automaton = ahocorasick.Automaton()
+        for pattern, hits in pattern_hits.items():
+            automaton.add_word(pattern, tuple(hits))
+        automaton.make_automaton()
+        return automaton
 
     def process_sarif_file(self, sarif_path):
         """Process a single SARIF file and extract compliance data"""
+        self._run_timestamp = datetime.now().isoformat()
         try:
-            with open(sarif_path, 'r') as f:
-                sarif_data = json.load(f)
-            
             results = []
-            for run in sarif_data.get('runs', []):
-                for result in run.get('results', []):
-                    processed_result = self.process_result(result, run)
-                    if processed_result:
-                        results.append(processed_result)
+            for result in iter_sarif_results(sarif_path):
+                processed_result = self.process_result(result)
+                if processed_result:
+                    results.append(processed_result)
             
             return results
             
@@ -54,76 +148,83 @@ class SARIFProcessor:
             print(f"Error processing SARIF file {sarif_path}: {e}")
             return []
 
-    def process_result(self, result, run):
+    def process_result(self, result, run=None):
         """Process individual SARIF result"""
-        rule_id = result.get('ruleId', '')
-        message = result.get('message', {}).get('text', '')
-        level = result.get('level', 'note')
+        result_get = result.get
+        # Interned so every finding of a rule shares one string and cache key
+        rule_id = sys.intern(result_get('ruleId', ''))
+        message = result_get('message', EMPTY).get('text', '')
+        level = result_get('level', 'note')
         
         # Map to compliance frameworks
-        compliance_mappings = {
-            'rbi': self.get_rbi_mapping(rule_id),
-            'iso27001': self.get_iso27001_mapping(rule_id),
-            'sebi': self.get_sebi_mapping(rule_id)
-        }
+        compliance_mappings = self._scan(rule_id)
         
         # Extract location information
         locations = []
-        for location in result.get('locations', []):
-            physical_location = location.get('physicalLocation', {})
-            artifact_location = physical_location.get('artifactLocation', {})
-            region = physical_location.get('region', {})
+        append_location = locations.append
+        for location in result_get('locations', _NO_LOCATIONS):
+            physical_location = location.get('physicalLocation', EMPTY)
+            artifact_location = physical_location.get('artifactLocation', EMPTY)
+            region = physical_location.get('region', EMPTY)
             
-            locations.append({
-                'file': artifact_location.get('uri', ''),
-                'start_line': region.get('startLine', 0),
-                'start_column': region.get('startColumn', 0),
-                'end_line': region.get('endLine', 0),
-                'end_column': region.get('endColumn', 0)
-            })
+            append_location(Location(
+                artifact_location.get('uri', ''),
+                region.get('startLine', 0),
+                region.get('startColumn', 0),
+                region.get('endLine', 0),
+                region.get('endColumn', 0)
+            ))
         
-        return {
-            'rule_id': rule_id,
-            'message': message,
-            'level': level,
-            'compliance_mappings': compliance_mappings,
-            'locations': locations,
-            'fingerprint': result.get('fingerprints', {}),
-            'timestamp': datetime.now().isoformat()
-        }
+        return ProcessedResult(
+            rule_id,
+            message,
+            level,
+            compliance_mappings,
+            locations,
+            result_get('fingerprints', {}),
+            self._run_timestamp or datetime.now().isoformat()
+        )
+
+    def _scan(self, rule_id):
+        """Map a rule to every framework in a single pass over the lowercased rule id"""
+        cached = self._rule_cache.get(rule_id)
+        if cached is not None:
+            return cached
+        
+        rule_lower = rule_id.lower()
+        matches = {}
+        
+        if self._automaton is not None:
+            # Patterns are checked in declaration order, so the earliest declared
+            # pattern wins when several match the same framework
+            for _, hits in self._automaton.iter(rule_lower):
+                for framework, order, mapping in hits:
+                    if framework not in matches or order < matches[framework][0]:
+                        matches[framework] = (order, mapping)
+        else:
+            # The table is in declaration order, so the first hit per framework wins
+            for pattern, framework, order, mapping in self._all_mappings:
+                if framework not in matches and pattern in rule_lower:
+                    matches[framework] = (order, mapping)
+        
+        compliance_mappings = {}
+        for framework, _ in self._framework_mappings:
+            compliance_mappings[framework] = matches[framework][1] if framework in matches else None
+        
+        self._rule_cache[rule_id] = compliance_mappings
+        return compliance_mappings
 
     def get_rbi_mapping(self, rule_id):
         """Map CodeQL rule to RBI IT Framework controls"""
-        for pattern, mapping in self.rbi_mappings.items():
-            if pattern in rule_id.lower():
-                return {
-                    'control': mapping,
-                    'description': f'RBI IT Framework control {mapping}',
-                    'category': 'Information Security'
-                }
-        return None
+        return self._scan(rule_id)['rbi']
 
     def get_iso27001_mapping(self, rule_id):
         """Map CodeQL rule to ISO 27001 controls"""
-        for pattern, mapping in self.iso27001_mappings.items():
-            if pattern in rule_id.lower():
-                return {
-                    'control': mapping,
-                    'description': f'ISO 27001 control {mapping}',
-                    'category': 'Information Security Management'
-                }
-        return None
+        return self._scan(rule_id)['iso27001']
 
     def get_sebi_mapping(self, rule_id):
         """Map CodeQL rule to SEBI IT Governance controls"""
-        for pattern, mapping in self.sebi_mappings.items():
-            if pattern in rule_id.lower():
-                return {
-                    'control': mapping,
-                    'description': f'SEBI IT Governance {mapping}',
-                    'category': 'System Governance'
-                }
-        return None
+        return self._scan(rule_id)['sebi']
 
     def generate_compliance_summary(self, results):
         """Generate compliance summary from processed results"""
@@ -132,28 +233,20 @@ class SARIFProcessor:
             'by_severity': {'critical': 0, 'high': 0, 'medium': 0, 'low': 0},
             'by_framework': {'rbi': 0, 'iso27001': 0, 'sebi': 0},
             'compliance_status': 'PASS',
-            'generated_at': datetime.now().isoformat()
+            'generated_at': self._run_timestamp or datetime.now().isoformat()
         }
         
-        critical_count = 0
-        high_count = 0
+        # Count by severity
+        levels = Counter(result.level for result in results)
+        for level, count in levels.items():
+            summary['by_severity'][LEVEL_MAP.get(level, 'low')] += count
+        
+        critical_count = summary['by_severity']['critical']
+        high_count = summary['by_severity']['high']
         
         for result in results:
-            # Count by severity
-            level = result['level']
-            if level == 'error':
-                summary['by_severity']['critical'] += 1
-                critical_count += 1
-            elif level == 'warning':
-                summary['by_severity']['high'] += 1
-                high_count += 1
-            elif level == 'note':
-                summary['by_severity']['medium'] += 1
-            else:
-                summary['by_severity']['low'] += 1
-            
             # Count by framework
-            mappings = result['compliance_mappings']
+            mappings = result.compliance_mappings
             if mappings.get('rbi'):
                 summary['by_framework']['rbi'] += 1
             if mappings.get('iso27001'):
@@ -171,6 +264,31 @@ class SARIFProcessor:
         
         return summary
 
+def to_json_default(obj):
+    """Serialize processed results and locations for the json module"""
+    if isinstance(obj, (ProcessedResult, Location)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def write_report_json(path, report):
+    """Write the report, streaming detailed results one at a time"""
+    with open(path, 'wb') as f:
+        f.write(b'{')
+        for index, (key, value) in enumerate(report.items()):
+            f.write(b',\n  ' if index else b'\n  ')
+            f.write(dump_json(key) + b': ')
+            
+            if key == 'detailed_results' and value:
+                # Serialize results individually so the full list is never one buffer
+                f.write(b'[')
+                for result_index, result in enumerate(value):
+                    f.write(b',\n    ' if result_index else b'\n    ')
+                    f.write(dump_json(result, depth=2, default=to_json_default))
+                f.write(b'\n  ]')
+            else:
+                f.write(dump_json(value, depth=1, default=to_json_default))
+        f.write(b'\n}')
+
 def main():
     parser = argparse.ArgumentParser(description='Process SARIF files for BFSI compliance')
     parser.add_argument('sarif_file', help='Path to SARIF file')
@@ -194,8 +312,7 @@ def main():
     }
     
     # Write output
-    with open(args.output, 'w') as f:
-        json.dump(report, f, indent=2)
+    write_report_json(args.output, report)
     
     print(f"Compliance report generated: {args.output}")
     print(f"Total findings: {summary['total_findings']}")
@@ -0,0 +1,93 @@
+"""
+SARIF and JSON I/O helpers shared by the BFSI security scripts
+Imported by the scripts in this directory, which Python puts on sys.path when they run
+"""
+
+import json
+import mmap
+import os
+from itertools import chain
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Files at least this large are parsed straight from a memory map when orjson is available
+MMAP_THRESHOLD = 100 * 1024 * 1024
+
+# Severity bucket for each SARIF level; anything else counts as low
+LEVEL_MAP = {'error': 'critical', 'warning': 'high', 'note': 'medium'}
+
+# Shared read-only default for nested lookups, so missing keys don't allocate a dict
+EMPTY = {}
+
+def iter_sarif_files(root, skip_hidden=False):
+    """Yield paths of SARIF files under root, skipping directories that cannot be read
+    
+    With skip_hidden, dot-files and dot-directories are left out, as glob.glob('**/*.sarif') does.
+    """
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                if skip_hidden and entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif entry.name.endswith('.sarif') and entry.is_file():
+                    yield entry.path
+
+def iter_sarif_results(sarif_path):
+    """Iterate every result of every run in a SARIF file, streaming with ijson when available"""
+    if ijson is not None:
+        return _stream_sarif_results(sarif_path)
+    
+    # Flatten runs into one C-level iterator rather than nested Python loops
+    sarif_data = load_json_file(sarif_path)
+    return chain.from_iterable(run.get('results', ()) for run in sarif_data.get('runs', ()))
+
+def _stream_sarif_results(sarif_path):
+    """Yield SARIF results with ijson, keeping the file open only while iterating"""
+    with open(sarif_path, 'rb') as f:
+        yield from ijson.items(f, 'runs.item.results.item', use_float=True)
+
+def load_json_file(path):
+    """Load a JSON file from its raw bytes with orjson when available, otherwise the json module"""
+    with open(path, 'rb') as f:
+        if orjson is None:
+            return json.loads(f.read())
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
+def dump_json(value, depth=0, default=None):
+    """Serialize a value as 2-space indented JSON bytes nested depth levels deep
+    
+    default is only used by the json module fallback; orjson serializes dataclasses natively.
+    """
+    if orjson is not None:
+        data = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(value, indent=2, default=default).encode('utf-8')
+    if depth:
+        # Encoded JSON strings never contain raw newlines, so this only shifts layout
+        data = data.replace(b'\n', b'\n' + b'  ' * depth)
+    return data
+
+def write_json_file(path, data):
+    """Write data as 2-space indented JSON with orjson when available"""
+    with open(path, 'wb') as f:
+        f.write(dump_json(data))
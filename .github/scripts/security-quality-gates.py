@@ -4,11 +4,18 @@ Security Quality Gates for BFSI Applications
 Enforces security standards and fails builds for non-compliant applications
 """
 
-import json
 import sys
 import argparse
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from sarif_io import (EMPTY, LEVEL_MAP, iter_sarif_files, iter_sarif_results, load_json_file,
+                      write_json_file)
+
 class SecurityQualityGates:
     def __init__(self):
         self.quality_gates = {
@@ -51,38 +58,101 @@ class SecurityQualityGates:
                 'message': 'ISO 27001 compliance score below target'
             }
         }
+        
+        # Critical rules for financial applications
+        self.critical_financial_rules = [
+            'payment-data-exposure',
+            'weak-transaction-encryption', 
+            'pii-exposure',
+            'rbi-data-localization'
+        ]
+        # One alternation over all critical rules, searched against lowercased rule ids
+        self._critical_rule_re = re.compile('|'.join(map(re.escape, self.critical_financial_rules)))
+        
+        # Set when the last scan stopped early under fast-fail, leaving partial counts
+        self.fast_fail_triggered = False
+        
+        self._refresh_gates()
 
-    def evaluate_sarif_results(self, sarif_dir):
-        """Evaluate SARIF results against quality gates"""
+    def _refresh_gates(self):
+        """Rebuild the (severity, max_allowed, fail_build, message) gate table after gate changes"""
+        self._gate_tuples = tuple(
+            (severity, gate['max_allowed'], gate['fail_build'], gate['message'])
+            for severity, gate in self.quality_gates.items()
+        )
+
+    def scan_sarif_results(self, sarif_dir, fast_fail=False):
+        """Count findings by severity and collect critical financial rule hits in one pass
+        
+        With fast_fail, scanning stops at the first finding that trips a zero-tolerance
+        build-failing gate, so the returned counts may be partial.
+        """
         findings = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
-        violations = []
+        found_critical_violations = []
+        self.fast_fail_triggered = False
+        
+        # Process all SARIF files, in parallel worker processes when there are several
+        sarif_files = sorted(iter_sarif_files(sarif_dir))
+        stop_severities = self.zero_tolerance_severities() if fast_fail else None
+        scan_file = partial(scan_sarif_file, critical_rules=tuple(self.critical_financial_rules),
+                            stop_severities=stop_severities, critical_rule_re=self._critical_rule_re)
         
-        # Process all SARIF files
-        for sarif_file in Path(sarif_dir).glob('**/*.sarif'):
+        if len(sarif_files) > 1:
             try:
-                with open(sarif_file, 'r') as f:
-                    sarif_data = json.load(f)
-                
-                # Count findings by severity
-                for run in sarif_data.get('runs', []):
-                    for result in run.get('results', []):
-                        level = result.get('level', 'note')
-                        if level == 'error':
-                            findings['critical'] += 1
-                        elif level == 'warning':
-                            findings['high'] += 1
-                        elif level == 'note':
-                            findings['medium'] += 1
-                        else:
-                            findings['low'] += 1
-                            
-            except Exception as e:
-                print(f"Error processing SARIF file {sarif_file}: {e}")
+                with ProcessPoolExecutor(max_workers=min(len(sarif_files), os.cpu_count() or 1)) as executor:
+                    file_results = self._collect_file_scans(
+                        sarif_files, executor.map(scan_file, sarif_files), stop_severities)
+                    if len(file_results) < len(sarif_files):
+                        # Fast-fail stopped collecting, so drop the files still queued
+                        executor.shutdown(wait=True, cancel_futures=True)
+            except (OSError, NotImplementedError) as e:
+                print(f"Warning: Process pool unavailable ({e}), scanning sequentially")
+                file_results = self._collect_file_scans(
+                    sarif_files, map(scan_file, sarif_files), stop_severities)
+        else:
+            file_results = self._collect_file_scans(
+                sarif_files, map(scan_file, sarif_files), stop_severities)
+        
+        for file_findings, file_violations in file_results:
+            for severity, count in file_findings.items():
+                findings[severity] += count
+            found_critical_violations.extend(file_violations)
+        
+        return findings, found_critical_violations
+
+    def zero_tolerance_severities(self):
+        """Severities whose gate fails the build on the first finding"""
+        return frozenset(
+            severity for severity, max_allowed, fail_build, _ in self._gate_tuples
+            if fail_build and max_allowed == 0
+        )
+
+    def _collect_file_scans(self, sarif_files, file_scans, stop_severities):
+        """Collect per-file scan results, stopping after a file that trips fast-fail"""
+        file_results = []
+        for sarif_file, (file_findings, file_violations) in zip(sarif_files, file_scans):
+            file_results.append((file_findings, file_violations))
+            
+            if stop_severities is not None and (
+                    file_violations or any(file_findings[severity] for severity in stop_severities)):
+                print(f"Fast-fail: build-failing finding in {sarif_file}, skipping remaining SARIF results")
+                self.fast_fail_triggered = True
+                break
+        
+        return file_results
+
+    def evaluate_sarif_results(self, sarif_dir, fast_fail=False):
+        """Evaluate SARIF results against quality gates"""
+        findings, _ = self.scan_sarif_results(sarif_dir, fast_fail)
+        return findings, self.evaluate_findings(findings)
+
+    def evaluate_findings(self, findings):
+        """Evaluate severity counts against quality gates"""
+        violations = []
         
-        # Evaluate against quality gates
-        for severity, count in findings.items():
-            gate = self.quality_gates.get(severity, {})
-            max_allowed = gate.get('max_allowed', float('inf'))
+        # Severities without a gate are never limited
+        for severity, max_allowed, fail_build, message in self._gate_tuples:
+            count = findings.get(severity, 0)
             
             if count > max_allowed:
                 violations.append({
@@ -90,19 +160,18 @@ class SecurityQualityGates:
                     'severity': severity,
                     'count': count,
                     'max_allowed': max_allowed,
-                    'fail_build': gate.get('fail_build', False),
-                    'message': gate.get('message', f'{severity} findings exceed threshold')
+                    'fail_build': fail_build,
+                    'message': message
                 })
         
-        return findings, violations
+        return violations
 
     def evaluate_compliance_scores(self, compliance_file):
         """Evaluate compliance scores against quality gates"""
         violations = []
         
         try:
-            with open(compliance_file, 'r') as f:
-                compliance_data = json.load(f)
+            compliance_data = load_json_file(compliance_file)
             
             frameworks = compliance_data.get('frameworks', {})
             
@@ -128,40 +197,13 @@ class SecurityQualityGates:
 
     def check_financial_specific_rules(self, sarif_dir):
         """Check BFSI-specific security rules"""
+        _, found_critical_violations = self.scan_sarif_results(sarif_dir)
+        return self.evaluate_financial_violations(found_critical_violations)
+
+    def evaluate_financial_violations(self, found_critical_violations):
+        """Turn critical financial rule hits into a build-failing violation"""
         violations = []
         
-        # Critical rules for financial applications
-        critical_rules = [
-            'payment-data-exposure',
-            'weak-transaction-encryption', 
-            'pii-exposure',
-            'rbi-data-localization'
-        ]
-        
-        found_critical_violations = []
-        
-        for sarif_file in Path(sarif_dir).glob('**/*.sarif'):
-            try:
-                with open(sarif_file, 'r') as f:
-                    sarif_data = json.load(f)
-                
-                for run in sarif_data.get('runs', []):
-                    for result in run.get('results', []):
-                        rule_id = result.get('ruleId', '')
-                        
-                        # Check for critical financial rules
-                        for critical_rule in critical_rules:
-                            if critical_rule in rule_id.lower():
-                                found_critical_violations.append({
-                                    'rule': critical_rule,
-                                    'rule_id': rule_id,
-                                    'message': result.get('message', {}).get('text', ''),
-                                    'level': result.get('level', 'note')
-                                })
-                                
-            except Exception as e:
-                print(f"Error processing SARIF file {sarif_file}: {e}")
-        
         # Any critical financial rule violation fails the build
         if found_critical_violations:
             violations.append({
@@ -173,8 +215,12 @@ class SecurityQualityGates:
         
         return violations
 
-    def generate_quality_gate_report(self, findings, all_violations):
-        """Generate quality gate evaluation report"""
+    def generate_quality_gate_report(self, findings, all_violations, fast_fail=False):
+        """Generate quality gate evaluation report along with its build-failing violations
+        
+        With fast_fail, the report records whether the scan stopped early, in which
+        case findings_summary holds partial counts.
+        """
         report = {
             'quality_gate_status': 'PASS',
             'timestamp': '2024-06-30T12:00:00Z',
@@ -193,7 +239,70 @@ class SecurityQualityGates:
             report['quality_gate_status'] = 'WARNING'
             report['build_decision'] = 'PASS'
         
-        return report
+        if fast_fail:
+            report['fast_fail_triggered'] = self.fast_fail_triggered
+        
+        return report, fail_build_violations
+
+def scan_sarif_file(sarif_file, critical_rules, stop_severities=None, critical_rule_re=None):
+    """Count one SARIF file's findings by severity and collect its critical financial rule hits
+    
+    When stop_severities is given, scanning stops after the first finding in one of
+    those severities or the first critical financial rule hit. critical_rule_re, an
+    alternation of critical_rules, lets rule ids that match none of them skip the
+    per-rule substring checks.
+    """
+    findings = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
+    found_critical_violations = []
+    # Critical rules matched by each rule id seen in this file
+    rule_matches = {}
+    
+    def result_levels():
+        append_violation = found_critical_violations.append
+        for result in iter_sarif_results(sarif_file):
+            result_get = result.get
+            level = result_get('level', 'note')
+            
+            # Check for critical financial rules
+            # Interned so repeated rule ids share one string and cache key
+            rule_id = sys.intern(result_get('ruleId', ''))
+            matched_rules = rule_matches.get(rule_id)
+            if matched_rules is None:
+                rule_lower = rule_id.lower()
+                if critical_rule_re is not None and critical_rule_re.search(rule_lower) is None:
+                    matched_rules = ()
+                else:
+                    # Several rules can match one rule id, so list every one
+                    matched_rules = tuple(rule for rule in critical_rules if rule in rule_lower)
+                rule_matches[rule_id] = matched_rules
+            
+            for critical_rule in matched_rules:
+                append_violation({
+                    'rule': critical_rule,
+                    'rule_id': rule_id,
+                    'message': result_get('message', EMPTY).get('text', ''),
+                    'level': level
+                })
+            
+            yield level
+            
+            if stop_severities is not None and (
+                    matched_rules or LEVEL_MAP.get(level, 'low') in stop_severities):
+                return
+    
+    # A parse error discards the whole file, whether or not the results were streamed
+    levels = Counter()
+    try:
+        levels.update(result_levels())
+    except Exception as e:
+        print(f"Error processing SARIF file {sarif_file}: {e}")
+        return findings, []
+    
+    # Count findings by severity
+    for level, count in levels.items():
+        findings[LEVEL_MAP.get(level, 'low')] += count
+    
+    return findings, found_critical_violations
 
 def main():
     parser = argparse.ArgumentParser(description='Evaluate security quality gates for BFSI applications')
@@ -202,6 +311,8 @@ def main():
     parser.add_argument('--fail-on-critical', type=bool, default=True, help='Fail build on critical issues')
     parser.add_argument('--fail-on-high', type=bool, default=True, help='Fail build on high severity issues')
     parser.add_argument('--max-medium', type=int, default=5, help='Maximum allowed medium severity issues')
+    parser.add_argument('--fast-fail', action='store_true',
+                        help='Stop scanning at the first finding that fails the build')
     parser.add_argument('--compliance-standards', help='Comma-separated list of compliance standards to check')
     parser.add_argument('--output', default='quality-gate-report.json', help='Output report file')
     
@@ -216,9 +327,11 @@ def main():
         quality_gates.quality_gates['high']['fail_build'] = False
     
     quality_gates.quality_gates['medium']['max_allowed'] = args.max_medium
+    quality_gates._refresh_gates()
     
-    # Evaluate SARIF results
-    findings, security_violations = quality_gates.evaluate_sarif_results(args.sarif_dir)
+    # Scan SARIF results once for both severity gates and financial rules
+    findings, found_critical_violations = quality_gates.scan_sarif_results(args.sarif_dir, args.fast_fail)
+    security_violations = quality_gates.evaluate_findings(findings)
     
     # Evaluate compliance scores
     compliance_violations = []
@@ -226,23 +339,25 @@ def main():
         compliance_violations = quality_gates.evaluate_compliance_scores(args.compliance_file)
     
     # Check financial-specific rules
-    financial_violations = quality_gates.check_financial_specific_rules(args.sarif_dir)
+    financial_violations = quality_gates.evaluate_financial_violations(found_critical_violations)
     
     # Combine all violations
     all_violations = security_violations + compliance_violations + financial_violations
     
     # Generate report
-    report = quality_gates.generate_quality_gate_report(findings, all_violations)
+    report, fail_build_violations = quality_gates.generate_quality_gate_report(
+        findings, all_violations, args.fast_fail)
     
     # Write report
-    with open(args.output, 'w') as f:
-        json.dump(report, f, indent=2)
+    write_json_file(args.output, report)
     
     # Print summary
     print(f"Quality Gate Evaluation Summary:")
     print(f"Status: {report['quality_gate_status']}")
     print(f"Build Decision: {report['build_decision']}")
     print(f"Total Findings: {sum(findings.values())}")
+    if quality_gates.fast_fail_triggered:
+        print("Note: fast-fail stopped the scan early, so finding totals are partial")
     print(f"Total Violations: {len(all_violations)}")
     
     if all_violations:
@@ -255,7 +370,6 @@ def main():
                 print("   ⚠️  WARNING")
     
     # Exit with appropriate code
-    fail_build_violations = [v for v in all_violations if v.get('fail_build', False)]
     if fail_build_violations:
         print(f"\n❌ BUILD FAILED: {len(fail_build_violations)} quality gate violations")
         sys.exit(1)
@@ -6,20 +6,165 @@ Consolidates various compliance reports for Indian Financial Institutions
 
 import os
 import json
-import yaml
-import argparse
+import mmap
+import bisect
 import datetime
+import threading
+from string import Template
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Fastest available decoder for whole JSON documents
+from_json = orjson.loads if orjson is not None else json.loads
+
+# Report loading is I/O bound, so use more threads than cores
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Past this much SARIF input, parsing is CPU bound and worth worker processes
+PROCESS_POOL_MIN_BYTES = 64 * 1024 * 1024
+
+# Report skeleton, kept next to this script so it can be edited without code changes
+REPORT_TEMPLATE = Template(
+    (Path(__file__).resolve().parent / 'report.md.tmpl').read_text(encoding='utf-8')
+)
+
+# Check mark that marks a passing compliance report, as UTF-8 bytes
+PASS_MARK = '✅'.encode('utf-8')
+
+# Compliance reports at least this large are searched through a memory map
+MMAP_MIN_SIZE = 64 * 1024
+
+if msgspec is not None:
+    # Only the fields the report reads are decoded; results stay raw and are just counted
+    class _SarifDriver(msgspec.Struct):
+        name: Any = 'Unknown'
+
+    class _SarifTool(msgspec.Struct):
+        driver: _SarifDriver = msgspec.field(default_factory=_SarifDriver)
+
+    class _SarifRun(msgspec.Struct):
+        tool: _SarifTool = msgspec.field(default_factory=_SarifTool)
+        results: List[msgspec.Raw] = []
+
+    class _SarifLog(msgspec.Struct):
+        runs: List[_SarifRun] = msgspec.field(default_factory=lambda: [_SarifRun()])
+
+    _sarif_decoder = msgspec.json.Decoder(_SarifLog)
+
+def _summarize_sarif(raw: bytes, parser: Any = None) -> Tuple[Any, int]:
+    """Return the first run's tool name and result count from raw SARIF bytes
+    
+    Without msgspec, a simdjson parser is used when given: its lazy proxies only
+    build Python objects for the fields read here and count results in C.
+    """
+    if msgspec is not None:
+        run = _sarif_decoder.decode(raw).runs[0]
+        return run.tool.driver.name, len(run.results)
+    
+    data = parser.parse(raw) if parser is not None else from_json(raw)
+    run = data.get('runs', [{}])[0]
+    return run.get('tool', {}).get('driver', {}).get('name', 'Unknown'), len(run.get('results', []))
+
+# Lazy JSON parsers are reused across SARIF files, one per loader thread or process
+_parsers = threading.local()
+
+def _json_parser() -> Any:
+    """Return this thread's simdjson parser, or None when msgspec or no simdjson is used"""
+    if simdjson is None or msgspec is not None:
+        return None
+    
+    parser = getattr(_parsers, 'parser', None)
+    if parser is None:
+        parser = _parsers.parser = simdjson.Parser()
+    return parser
+
+def _parse_sarif(sarif_file: Path) -> Dict[str, Any]:
+    """Summarize one SARIF report; runs in loader threads or worker processes"""
+    tool, results_count = _summarize_sarif(sarif_file.read_bytes(), _json_parser())
+    return {
+        'file': str(sarif_file),
+        'tool': tool,
+        'results_count': results_count
+    }
+
+def _total_size(paths: List[Path]) -> int:
+    """Return the combined size of the files that can be stat'ed"""
+    total = 0
+    for path in paths:
+        try:
+            total += os.stat(path).st_size
+        except OSError:
+            pass
+    return total
+
+def _capture(loader: Callable[[Path], Any], path: Path) -> Tuple[Any, Optional[Exception]]:
+    """Run loader on path, returning its result or the exception it raised"""
+    try:
+        return loader(path), None
+    except Exception as e:
+        # Drop the traceback so the loader's frames, and any simdjson proxies they
+        # hold, are freed before this thread's parser is reused
+        return None, e.with_traceback(None)
 
 class BFSIComplianceReporter:
     """Generates comprehensive compliance reports for BFSI applications"""
     
+    _STATUS_ICONS = {
+        'compliant': '✅',
+        'non-compliant': '❌',
+        'unknown': '⚠️'
+    }
+    
+    _BASE_SCORE = 85  # Base compliance score
+    
+    # Score for each known status; any other status keeps the base score
+    _STATUS_SCORES = {
+        'compliant': min(100, _BASE_SCORE + 10),
+        'non-compliant': max(0, _BASE_SCORE - 20)
+    }
+    
+    # Finding-count bands: under 10, under 50, 50 or more
+    _RISK_THRESHOLDS = (10, 50)
+    # Low risk also needs at least this many compliant frameworks
+    _LOW_RISK_MIN_COMPLIANT = 3
+    # Risk message by finding band, then by whether enough frameworks are compliant
+    _RISK_MESSAGES = (
+        ("🟡 **MEDIUM RISK** - Some areas need attention", "🟢 **LOW RISK** - Good security posture and compliance"),
+        ("🟡 **MEDIUM RISK** - Some areas need attention", "🟡 **MEDIUM RISK** - Some areas need attention"),
+        ("🔴 **HIGH RISK** - Immediate action required", "🔴 **HIGH RISK** - Immediate action required")
+    )
+    
     def __init__(self, input_dir: str, output_dir: str):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Filename tag identifying each framework's compliance report, checked in order
+        self._fname_tags = (('rbi', 'RBI'), ('sebi', 'SEBI'), ('irdai', 'IRDAI'))
+        
+        # Input files by category, filled by the first _scan_inputs call
+        self._input_files = None
+        
+        # Time of the last generated report, reused for its default filename
+        self._generated_at = None
+        
         # Compliance frameworks
         self.frameworks = {
             'RBI': {
@@ -44,6 +189,55 @@ class BFSIComplianceReporter:
             }
         }
     
+    def _scan_inputs(self) -> Dict[str, List[Path]]:
+        """Classify input files by report type in a single walk of the input directory"""
+        if self._input_files is None:
+            sarif_files = []
+            compliance_files = []
+            
+            # Top-down walk visits files in the same order as Path.glob('**/...')
+            for root, _, files in os.walk(self.input_dir):
+                for name in files:
+                    if name.endswith('.sarif'):
+                        sarif_files.append(Path(root, name))
+                    elif name.endswith('.md') and 'compliance' in name[:-3]:
+                        compliance_files.append(Path(root, name))
+            
+            self._input_files = {'sarif': sarif_files, 'compliance': compliance_files}
+        
+        return self._input_files
+    
+    def _load_concurrently(self, loader: Callable[[Path], Any], paths: List[Path],
+                           processes: bool = False) -> List[Tuple[Path, Tuple[Any, Optional[Exception]]]]:
+        """Run loader over paths in a thread pool, keeping results in input order
+        
+        With processes, a module-level loader runs in worker processes instead, for
+        CPU-bound parsing that threads would serialize on the GIL.
+        """
+        if len(paths) > 1 and processes:
+            try:
+                with ProcessPoolExecutor(max_workers=min(len(paths), os.cpu_count() or 1)) as executor:
+                    outcomes = list(executor.map(_capture, [loader] * len(paths), paths))
+                return list(zip(paths, outcomes))
+            except (OSError, NotImplementedError) as e:
+                print(f"Warning: Process pool unavailable ({e}), loading with threads")
+        
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(paths), IO_WORKERS)) as executor:
+                outcomes = list(executor.map(_capture, [loader] * len(paths), paths))
+        else:
+            outcomes = [_capture(loader, path) for path in paths]
+        
+        return list(zip(paths, outcomes))
+    
+    def _read_compliance_report(self, report_file: Path) -> bool:
+        """Return whether a compliance report contains a passing check mark"""
+        with open(report_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size < MMAP_MIN_SIZE:
+                return PASS_MARK in f.read()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped.find(PASS_MARK) != -1
+    
     def load_security_reports(self) -> Dict[str, Any]:
         """Load security scan reports"""
         security_data = {
@@ -54,17 +248,13 @@ class BFSIComplianceReporter:
         }
         
         # Load SARIF reports
-        for sarif_file in self.input_dir.glob('**/*.sarif'):
-            try:
-                with open(sarif_file) as f:
-                    data = json.load(f)
-                    security_data['sarif_reports'].append({
-                        'file': str(sarif_file),
-                        'tool': data.get('runs', [{}])[0].get('tool', {}).get('driver', {}).get('name', 'Unknown'),
-                        'results_count': len(data.get('runs', [{}])[0].get('results', []))
-                    })
-            except Exception as e:
-                print(f"Error loading SARIF file {sarif_file}: {e}")
+        sarif_files = self._scan_inputs()['sarif']
+        use_processes = _total_size(sarif_files) >= PROCESS_POOL_MIN_BYTES
+        for sarif_file, (report, error) in self._load_concurrently(_parse_sarif, sarif_files, use_processes):
+            if error is not None:
+                print(f"Error loading SARIF file {sarif_file}: {error}")
+            else:
+                security_data['sarif_reports'].append(report)
         
         return security_data
     
@@ -80,20 +270,28 @@ class BFSIComplianceReporter:
                 'recommendations': []
             }
         
+        # The filename decides which framework a report is for; reports without a
+        # framework tag never change a status, so they are not opened at all
+        report_files = []
+        report_frameworks = []
+        for report_file in self._scan_inputs()['compliance']:
+            name_lower = report_file.name.lower()
+            for tag, framework in self._fname_tags:
+                if tag in name_lower:
+                    report_files.append(report_file)
+                    report_frameworks.append(framework)
+                    break
+        
         # Load compliance report files
-        for report_file in self.input_dir.glob('**/*compliance*.md'):
+        loaded = self._load_concurrently(self._read_compliance_report, report_files)
+        for framework, (report_file, (passed, error)) in zip(report_frameworks, loaded):
             try:
-                with open(report_file) as f:
-                    content = f.read()
+                if error is not None:
+                    raise error
+                
+                # Simple parsing for compliance status
+                compliance_data[framework]['status'] = 'compliant' if passed else 'non-compliant'
                     
-                    # Simple parsing for compliance status
-                    if 'rbi' in report_file.name.lower():
-                        compliance_data['RBI']['status'] = 'compliant' if '✅' in content else 'non-compliant'
-                    elif 'sebi' in report_file.name.lower():
-                        compliance_data['SEBI']['status'] = 'compliant' if '✅' in content else 'non-compliant'
-                    elif 'irdai' in report_file.name.lower():
-                        compliance_data['IRDAI']['status'] = 'compliant' if '✅' in content else 'non-compliant'
-                        
             except Exception as e:
                 print(f"Error loading compliance file {report_file}: {e}")
         
@@ -101,28 +299,46 @@ class BFSIComplianceReporter:
     
     def calculate_compliance_score(self, framework: str, compliance_data: Dict) -> int:
         """Calculate compliance score for a framework"""
-        base_score = 85  # Base compliance score
-        
         framework_data = compliance_data.get(framework, {})
         status = framework_data.get('status', 'unknown')
         
-        if status == 'compliant':
-            return min(100, base_score + 10)
-        elif status == 'non-compliant':
-            return max(0, base_score - 20)
-        else:
-            return base_score
+        return self._STATUS_SCORES.get(status, self._BASE_SCORE)
+    
+    def calculate_compliance_scores(self, compliance_data: Dict) -> Dict[str, int]:
+        """Calculate the compliance score of every assessed framework"""
+        return {
+            framework: self.calculate_compliance_score(framework, compliance_data)
+            for framework in self.frameworks
+        }
     
-    def generate_executive_summary(self, security_data: Dict, compliance_data: Dict) -> str:
+    def calculate_report_stats(self, security_data: Dict, compliance_data: Dict) -> Dict[str, Any]:
+        """Aggregate finding and framework status counts shared by the report sections"""
+        return {
+            # map/itemgetter keeps the whole reduction in C, with no generator frame
+            'total_findings': sum(map(itemgetter('results_count'), security_data.get('sarif_reports', []))),
+            'compliant': [
+                framework for framework, data in compliance_data.items()
+                if data.get('status') == 'compliant'
+            ],
+            'non_compliant': [
+                framework for framework, data in compliance_data.items()
+                if data.get('status') == 'non-compliant'
+            ]
+        }
+    
+    def generate_executive_summary(self, security_data: Dict, compliance_data: Dict,
+                                   stats: Optional[Dict] = None) -> str:
         """Generate executive summary"""
-        total_vulnerabilities = sum(
-            report['results_count'] for report in security_data.get('sarif_reports', [])
-        )
+        if stats is None:
+            stats = self.calculate_report_stats(security_data, compliance_data)
         
-        compliant_frameworks = sum(
-            1 for framework_data in compliance_data.values() 
-            if framework_data.get('status') == 'compliant'
-        )
+        total_vulnerabilities = stats['total_findings']
+        compliant_frameworks = len(stats['compliant'])
+        
+        finding_band = bisect.bisect_right(self._RISK_THRESHOLDS, total_vulnerabilities)
+        risk_assessment = self._RISK_MESSAGES[finding_band][
+            compliant_frameworks >= self._LOW_RISK_MIN_COMPLIANT
+        ]
         
         summary = f"""
 ## Executive Summary
@@ -137,86 +353,84 @@ class BFSIComplianceReporter:
 - **Frameworks Assessed**: {', '.join(self.frameworks.keys())}
 
 ### Risk Assessment
-{"🟢 **LOW RISK** - Good security posture and compliance" if total_vulnerabilities < 10 and compliant_frameworks >= 3 else "🟡 **MEDIUM RISK** - Some areas need attention" if total_vulnerabilities < 50 else "🔴 **HIGH RISK** - Immediate action required"}
+{risk_assessment}
 """
         return summary
     
-    def generate_framework_details(self, compliance_data: Dict) -> str:
+    def generate_framework_details(self, compliance_data: Dict,
+                                   scores: Optional[Dict[str, int]] = None) -> str:
         """Generate detailed framework compliance information"""
-        details = "## Regulatory Framework Compliance\n\n"
+        if scores is None:
+            scores = self.calculate_compliance_scores(compliance_data)
+        
+        parts = ["## Regulatory Framework Compliance\n\n"]
         
         for framework_key, framework_info in self.frameworks.items():
-            framework_data = compliance_data.get(framework_key, {})
-            score = self.calculate_compliance_score(framework_key, compliance_data)
-            status = framework_data.get('status', 'unknown')
+            status = compliance_data.get(framework_key, {}).get('status', 'unknown')
+            status_icon = self._STATUS_ICONS.get(status, '⚠️')
             
-            status_icon = {
-                'compliant': '✅',
-                'non-compliant': '❌',
-                'unknown': '⚠️'
-            }.get(status, '⚠️')
-            
-            details += f"""
+            categories = ', '.join(framework_info['categories'])
+            parts.append(f"""
 ### {status_icon} {framework_info['name']}
 - **Version**: {framework_info['version']}
-- **Compliance Score**: {score}%
+- **Compliance Score**: {scores[framework_key]}%
 - **Status**: {status.upper()}
-- **Categories**: {', '.join(framework_info['categories'])}
+- **Categories**: {categories}
 
-"""
+""")
         
-        return details
+        return ''.join(parts)
     
     def generate_security_details(self, security_data: Dict) -> str:
         """Generate detailed security scan information"""
-        details = "## Security Assessment Details\n\n"
+        parts = ["## Security Assessment Details\n\n"]
         
-        details += "### Static Application Security Testing (SAST)\n"
-        for report in security_data.get('sarif_reports', []):
-            details += f"- **{report['tool']}**: {report['results_count']} findings\n"
+        parts.append("### Static Application Security Testing (SAST)\n")
+        parts.extend(
+            f"- **{report['tool']}**: {report['results_count']} findings\n"
+            for report in security_data.get('sarif_reports', [])
+        )
         
-        details += "\n### Dependency Security\n"
+        parts.append("\n### Dependency Security\n")
         if security_data.get('dependency_reports'):
-            details += f"- **Reports Analyzed**: {len(security_data['dependency_reports'])}\n"
+            parts.append(f"- **Reports Analyzed**: {len(security_data['dependency_reports'])}\n")
         else:
-            details += "- No dependency reports found\n"
+            parts.append("- No dependency reports found\n")
         
-        details += "\n### Container Security\n"
+        parts.append("\n### Container Security\n")
         if security_data.get('container_reports'):
-            details += f"- **Images Scanned**: {len(security_data['container_reports'])}\n"
+            parts.append(f"- **Images Scanned**: {len(security_data['container_reports'])}\n")
         else:
-            details += "- No container reports found\n"
+            parts.append("- No container reports found\n")
         
-        return details
+        return ''.join(parts)
     
-    def generate_recommendations(self, security_data: Dict, compliance_data: Dict) -> str:
+    def generate_recommendations(self, security_data: Dict, compliance_data: Dict,
+                                 stats: Optional[Dict] = None) -> str:
         """Generate actionable recommendations"""
-        recommendations = "## Recommendations\n\n"
+        if stats is None:
+            stats = self.calculate_report_stats(security_data, compliance_data)
+        
+        parts = ["## Recommendations\n\n"]
         
         # Security recommendations
-        total_findings = sum(
-            report['results_count'] for report in security_data.get('sarif_reports', [])
-        )
+        total_findings = stats['total_findings']
         
         if total_findings > 50:
-            recommendations += "### 🔴 Critical Priority\n"
-            recommendations += "1. **Address Security Findings**: Immediate attention to security vulnerabilities\n"
-            recommendations += "2. **Security Review**: Conduct comprehensive security review\n"
-            recommendations += "3. **Penetration Testing**: Schedule external security assessment\n\n"
+            parts.append("### 🔴 Critical Priority\n"
+                         "1. **Address Security Findings**: Immediate attention to security vulnerabilities\n"
+                         "2. **Security Review**: Conduct comprehensive security review\n"
+                         "3. **Penetration Testing**: Schedule external security assessment\n\n")
         
         # Compliance recommendations
-        non_compliant = [
-            framework for framework, data in compliance_data.items()
-            if data.get('status') == 'non-compliant'
-        ]
+        non_compliant = stats['non_compliant']
         
         if non_compliant:
-            recommendations += "### 🟡 High Priority\n"
-            for framework in non_compliant:
-                recommendations += f"1. **{framework} Compliance**: Address compliance gaps\n"
-            recommendations += "\n"
+            parts.append("### 🟡 High Priority\n")
+            parts.extend(f"1. **{framework} Compliance**: Address compliance gaps\n" for framework in non_compliant)
+            parts.append("\n")
         
-        recommendations += """### 🟢 Medium Priority
+        parts.append("""### 🟢 Medium Priority
 1. **Regular Audits**: Schedule quarterly compliance reviews
 2. **Security Training**: Provide security awareness training
 3. **Documentation**: Update security and compliance documentation
@@ -226,80 +440,58 @@ class BFSIComplianceReporter:
 1. **Process Improvement**: Enhance development processes
 2. **Automation**: Increase automation in compliance checking
 3. **Metrics**: Implement compliance metrics dashboard
-"""
+""")
         
-        return recommendations
+        return ''.join(parts)
     
     def generate_compliance_report(self) -> str:
         """Generate comprehensive compliance report"""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._generated_at = datetime.datetime.now()
+        timestamp = self._generated_at.strftime("%Y-%m-%d %H:%M:%S")
         
         # Load data
         security_data = self.load_security_reports()
         compliance_data = self.load_compliance_reports()
         
+        # Aggregate once for every section
+        stats = self.calculate_report_stats(security_data, compliance_data)
+        scores = self.calculate_compliance_scores(compliance_data)
+        
         # Generate report sections
-        executive_summary = self.generate_executive_summary(security_data, compliance_data)
-        framework_details = self.generate_framework_details(compliance_data)
+        executive_summary = self.generate_executive_summary(security_data, compliance_data, stats)
+        framework_details = self.generate_framework_details(compliance_data, scores)
         security_details = self.generate_security_details(security_data)
-        recommendations = self.generate_recommendations(security_data, compliance_data)
+        recommendations = self.generate_recommendations(security_data, compliance_data, stats)
         
-        report = f"""# BFSI Comprehensive Compliance Report
-
-**Generated**: {timestamp}
-**Organization**: Financial Institution
-**Assessment Type**: Automated Compliance Validation
-
-{executive_summary}
-
-{framework_details}
-
-{security_details}
-
-{recommendations}
-
-## Appendix
-
-### Report Methodology
-This report is generated automatically by analyzing:
-- Static application security testing (SAST) results
-- Software composition analysis (SCA) reports
-- Container security scan results
-- Compliance validation outputs
-- Infrastructure security assessments
-
-### Compliance Frameworks Reference
-- **RBI**: Reserve Bank of India IT Framework for Banks/NBFCs
-- **SEBI**: Securities and Exchange Board of India IT Governance
-- **IRDAI**: Insurance Regulatory and Development Authority Guidelines
-- **ISO27001**: International Information Security Management Standard
-
-### Contact Information
-- **Compliance Team**: compliance@organization.com
-- **Security Team**: security@organization.com
-- **Technical Support**: devops@organization.com
-
----
-*This report is confidential and intended for internal use only.*
-"""
+        sections = {
+            'timestamp': timestamp,
+            'executive_summary': executive_summary,
+            'framework_details': framework_details,
+            'security_details': security_details,
+            'recommendations': recommendations
+        }
         
-        return report
+        # One pass over the static skeleton text, filling in the sections
+        return REPORT_TEMPLATE.substitute(sections)
     
     def save_report(self, report_content: str, filename: str = None) -> Path:
         """Save the report to file"""
         if filename is None:
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            generated_at = self._generated_at or datetime.datetime.now()
+            timestamp = generated_at.strftime("%Y%m%d_%H%M%S")
             filename = f"bfsi_compliance_report_{timestamp}.md"
         
         report_path = self.output_dir / filename
         
-        with open(report_path, 'w') as f:
-            f.write(report_content)
+        # One bulk write of the encoded report, skipping the text I/O layer
+        report_path.write_bytes(report_content.encode('utf-8'))
         
         return report_path
 
 def main():
     """Main function"""
+    import argparse
+    
     parser = argparse.ArgumentParser(description='Generate BFSI compliance report')
     parser.add_argument('--input-dir', required=True, help='Input directory with reports')
     parser.add_argument('--output-dir', required=True, help='Output directory for compliance report')